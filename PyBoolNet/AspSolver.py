@@ -1,13 +1,102 @@
+import concurrent.futures
 import datetime
+import functools
+import itertools
+import os
+import re
+import selectors
+import shutil
 import subprocess
+import threading
 
 import PyBoolNet.Utility.Misc
 
-CMD_GRINGO = PyBoolNet.Utility.Misc.find_command("gringo")
-CMD_CLASP = PyBoolNet.Utility.Misc.find_command("clasp")
+try:
+    import clingo
 
+except ImportError:
+    clingo = None
 
-def circuits(Primes, MaxOutput=1000, FnameASP=None, Representation="dict"):
+CMD_GRINGO = PyBoolNet.Utility.Misc.find_command("gringo")
+CMD_CLASP = PyBoolNet.Utility.Misc.find_command("clasp")
+CMD_CLINGO = shutil.which(PyBoolNet.Utility.Misc.find_command("clingo"))
+HAS_POTASSCO_BINARIES = CMD_CLINGO is not None or (shutil.which(CMD_GRINGO) is not None and shutil.which(CMD_CLASP) is not None)
+
+# reading the symbols of a model from the clingo module is slower than parsing the textual output of the binaries,
+# so enumerations that show more symbols are handed over to the binaries if they are installed
+CLINGO_API_MAX_SYMBOLS = 300
+
+# steady states of networks with at most this many variables are computed without the ASP solver
+STEADY_STATES_BITWISE_MAX = 18
+
+_HIT_RE = re.compile(r'hit\("([^"]+)",(\d+)\)')
+_PERC_RE = re.compile(r'percolated\("([^"]+)"\)')
+
+_ASP_HEADER = """\
+% PyBoolNet is available at https://github.com/hklarner/PyBoolNet
+
+% encoding of prime implicants as hyper-arcs that consist of a unique "target" and (possibly) several "sources".
+% "target" and "source" are triplets that consist of a variable name, an activity and a unique arc-identifier. 
+"""
+
+_ASP_TRAP_SET_RULES = """
+% generator: "in_set(ID)" specifies which arcs are chosen for a trap set (ID is unique for target(_,_,_)).
+{in_set(ID) : target(V,S,ID)}.
+
+% consistency constraint
+:- in_set(ID1), in_set(ID2), target(V,1,ID1), target(V,0,ID2).
+
+% stability constraint
+:- in_set(ID1), source(V,S,ID1), not in_set(ID2) : target(V,S,ID2).
+"""
+
+_ASP_PERCOLATION_RULES = """\
+% percolation constraint.
+% ensure that if all sources of a prime are hit then it must belong to the solution.
+in_set(ID) :- target(V,S,ID), hit(V1,S1) : source(V1,S1,ID)."""
+
+_ASP_BIJECTION_RULES = """\
+% bijection constraint (between asp solutions and trap spaces)
+% to avoid the repetition of equivalent solutions we add all prime implicants
+% that agree with the current solution.
+in_set(ID) :- target(V,S,ID), hit(V,S), hit(V1,S1) : source(V1,S1,ID)."""
+
+_ASP_CIRCUITS_RULES = """
+% circuits constraint, distinguishes between circuit nodes and percolated nodes
+upstream(V1,V2) :- in_set(ID), target(V1,S1,ID), source(V2,S2,ID).
+upstream(V1,V2) :- upstream(V1,V3), upstream(V3,V2).
+percolated(V1) :- hit(V1,S), not upstream(V1,V1)."""
+
+_ASP_HIT_RULES = """
+% "hit" captures the stable variables and their activities.
+hit(V,S) :- in_set(ID), target(V,S,ID)."""
+
+_ASP_HEURISTICS = {
+    "min": """
+% domain heuristic, prefers the arcs of subset minimal trap spaces
+#heuristic in_set(ID) : target(V,S,ID). [1,true]""",
+    "max": """
+% domain heuristic, prefers the arcs of subset maximal trap spaces
+#heuristic in_set(ID) : target(V,S,ID). [1,false]"""}
+
+_ASP_STATE_RULES = """
+% restriction to the prime implicants that are active in the state given by the external atoms "state(V,S)"
+#external state(V,S) : target(V,S,ID).
+#external state(V,S) : source(V,S,ID).
+active(ID) :- target(V,S,ID), state(V,S), state(V1,S1) : source(V1,S1,ID).
+:- in_set(ID), not active(ID)."""
+
+_ASP_SHOW_CIRCUITS = """
+% show fixed nodes and distinguish between circuits and percolated
+#show percolated/1.
+#show hit/2."""
+
+_ASP_SHOW_HITS = """
+% show fixed nodes
+#show hit/2."""
+
+
+def circuits(Primes, MaxOutput=1000, FnameASP=None, Representation="dict", Configuration=None):
     """
     Computes minimal trap spaces but also distinguishes between nodes that are fixed due to being part of a circuit
     and nodes that are fix due to percolation effects.
@@ -17,6 +106,7 @@ def circuits(Primes, MaxOutput=1000, FnameASP=None, Representation="dict"):
         * *MaxOutput*: maximum number of returned solutions
         * *FnameASP* (str): file name or *None*
         * *Representation* (str): either "str" or "dict", the representation of the trap spaces
+        * *Configuration* (str): clasp configuration preset, for example *"trendy"*, *"jumpy"* or *"crafty"*, or *None*
 
     **returns**:
         * *Circuits* (list): of tuples consisting of circuit nodes and percolation nodes
@@ -29,7 +119,7 @@ def circuits(Primes, MaxOutput=1000, FnameASP=None, Representation="dict"):
     """
     
     return potassco_handle(Primes, Type="circuits", Bounds=(0, "n"), Project=None, MaxOutput=MaxOutput,
-                           FnameASP=FnameASP, Representation=Representation)
+                           FnameASP=FnameASP, Representation=Representation, Configuration=Configuration)
 
 
 def percolate_trapspace(Primes, Trapspace):
@@ -78,20 +168,18 @@ def trapspaces_that_contain_state(Primes, State, Type, FnameASP=None, Representa
     """
     
     assert (len(Primes) == len(State))
-    assert (type(State) in [dict, str])
+    assert isinstance(State, (dict, str))
     
-    if type(State) == str:
+    if isinstance(State, str):
         State = PyBoolNet.StateTransitionGraphs.state2dict(Primes, State)
     
-    active_primes = PyBoolNet.PrimeImplicants.active_primes(Primes, State)
-    
     # note: Bounds=(1,"n") enforces at least one variable fixed.
     #       This is required for the subset maximal enumeration mode "--enum-mode=domRec --heuristic=Domain --dom-mod=3,16"
     #       Otherwise clasp returns "*** Warn : (clasp): domRec ignored: no domain atoms found!"
     #       Consequence: The trivial subspace is equivalent to the ASP problem being UNSATISFIABLE
     
-    tspaces = potassco_handle(active_primes, Type=Type, Bounds=(1, "n"), Project=[], MaxOutput=1000, FnameASP=FnameASP,
-                              Representation=Representation)
+    tspaces = potassco_handle(Primes, Type=Type, Bounds=(1, "n"), Project=None, MaxOutput=1000, FnameASP=FnameASP,
+                              Representation=Representation, State=State)
     
     if not tspaces:
         # ASP program is unsatisfiable
@@ -139,7 +227,35 @@ def smallest_trapspace(Primes, State, Representation="dict"):
     return trapspaces_that_contain_state(Primes, State, Type="min", FnameASP=None, Representation=Representation)
 
 
-def trap_spaces(Primes, Type, MaxOutput=1000, FnameASP=None, Representation="dict"):
+def smallest_trapspaces_batch(Primes, States, Workers=None, Representation="dict"):
+    """
+    Returns the (unique) smallest trap space for each state in *States*.
+    Calls :ref:`smallest_trapspace` for every state, the calls are distributed over *Workers* processes.
+
+    **arguments**:
+        * *Primes*: prime implicants
+        * *States* (list): states in dict or str format
+        * *Workers* (int): number of worker processes or *None* for the number of processors
+        * *Representation* (str): either "str" or "dict", the representation of the trap spaces
+
+    **returns**:
+        * *TrapSpaces* (list): the smallest trap spaces, in the same order as *States*
+
+    **example**::
+
+        >>> smallest_trapspaces_batch(primes, ["001", "110"], Representation="str")
+        ['001', '11-']
+    """
+    
+    # send the states in chunks, otherwise *Primes* is pickled and sent to a worker once per state
+    chunksize = max(1, len(States) // (4 * (Workers or os.cpu_count() or 1)))
+    
+    with concurrent.futures.ProcessPoolExecutor(max_workers=Workers) as executor:
+        return list(executor.map(smallest_trapspace, itertools.repeat(Primes), States, itertools.repeat(Representation),
+                                 chunksize=chunksize))
+
+
+def trap_spaces(Primes, Type, MaxOutput=1000, FnameASP=None, Representation="dict", Configuration=None):
     """
     Returns a list of trap spaces using the :ref:`installation_potassco` ASP solver, see :ref:`Gebser2011 <Gebser2011>`.
     For a formal introcution to trap spaces and the ASP encoding that is used for their computation see :ref:`Klarner2015(a) <klarner2015trap>`.
@@ -153,12 +269,17 @@ def trap_spaces(Primes, Type, MaxOutput=1000, FnameASP=None, Representation="dic
 
     To create the *asp* file for inspection or manual editing, pass a file name to *FnameASP*.
 
+    The parameter *Configuration* selects one of clasp's configuration presets, for example *"trendy"*, *"jumpy"* or *"crafty"*.
+    The presets bundle preprocessing, heuristic and restart strategies and may speed up hard instances.
+    See ``clasp --help=3`` for the available presets.
+
     **arguments**:
         * *Primes*: prime implicants
         * *Type* (str): either *"max"*, *"min"*, *"all"* or *"percolated"*
         * *MaxOutput* (int): maximal number of trap spaces to return
         * *FnameASP* (str): name of *asp* file to create, or *None*
         * *Representation* (str): either "str" or "dict", the representation of the trap spaces
+        * *Configuration* (str): clasp configuration preset, for example *"trendy"*, *"jumpy"* or *"crafty"*, or *None*
 
     **returns**:
         * *Subspaces* (list): the trap spaces
@@ -180,18 +301,21 @@ def trap_spaces(Primes, Type, MaxOutput=1000, FnameASP=None, Representation="dic
         Bounds = (1, "n")
     
     return potassco_handle(Primes, Type, Bounds=Bounds, Project=None, MaxOutput=MaxOutput, FnameASP=FnameASP,
-                           Representation=Representation)
+                           Representation=Representation, Configuration=Configuration)
 
 
-def steady_states(Primes, MaxOutput=1000, FnameASP=None, Representation="dict"):
+def steady_states(Primes, MaxOutput=1000, FnameASP=None, Representation="dict", Configuration=None):
     """
     Returns steady states.
+    The steady states of networks with at most *STEADY_STATES_BITWISE_MAX* variables are enumerated in Python
+    instead of by the ASP solver, unless *FnameASP* or *Configuration* are given.
 
     **arguments**:
         * *Primes*: prime implicants
         * *MaxOutput* (int): maximal number of trap spaces to return
         * *FnameASP*: file name or *None*
         * *Representation* (str): either "str" or "dict", the representation of the trap spaces
+        * *Configuration* (str): clasp configuration preset, for example *"trendy"*, *"jumpy"* or *"crafty"*, or *None*
 
     **returns**:
         * *States* (list): the steady states
@@ -203,14 +327,14 @@ def steady_states(Primes, MaxOutput=1000, FnameASP=None, Representation="dict"):
         2
     """
     
-    return potassco_handle(Primes, Type="all", Bounds=("n", "n"), Project=[], MaxOutput=MaxOutput, FnameASP=FnameASP,
-                           Representation=Representation)
+    return potassco_handle(Primes, Type="all", Bounds=("n", "n"), Project=None, MaxOutput=MaxOutput, FnameASP=FnameASP,
+                           Representation=Representation, Configuration=Configuration)
 
 
-def trap_spaces_bounded(Primes, Type, Bounds, MaxOutput=1000, FnameASP=None):
+def trap_spaces_bounded(Primes, Type, Bounds, MaxOutput=1000, FnameASP=None, Configuration=None):
     """
     Returns a list of bounded trap spaces using the Potassco_ ASP solver :ref:`[Gebser2011]<Gebser2011>`.
-    See :ref:`trap_spaces <sec:trap_spaces>` for details of the parameters *Type*, *MaxOutput* and *FnameASP*.
+    See :ref:`trap_spaces <sec:trap_spaces>` for details of the parameters *Type*, *MaxOutput*, *FnameASP* and *Configuration*.
     The parameter *Bounds* is used to restrict the set of trap spaces from which maximal, minimal or all solutions are drawn
     to those whose number of fixed variables are within the given range.
     Example: ``Bounds=(5,8)`` instructs Potassco_ to consider only trap spaces with 5 to 8 fixed variables as feasible.
@@ -229,6 +353,7 @@ def trap_spaces_bounded(Primes, Type, Bounds, MaxOutput=1000, FnameASP=None):
         * *Bounds* (tuple): the upper and lower bound for the number of fixed variables
         * *MaxOutput* (int): maximal number of trap spaces to return
         * *FnameASP*: file name or *None*
+        * *Configuration* (str): clasp configuration preset, for example *"trendy"*, *"jumpy"* or *"crafty"*, or *None*
     **returns**:
         * list of trap spaces
     **example**::
@@ -240,10 +365,10 @@ def trap_spaces_bounded(Primes, Type, Bounds, MaxOutput=1000, FnameASP=None):
     """
     
     return potassco_handle(Primes, Type, Bounds, Project=None, MaxOutput=MaxOutput, FnameASP=FnameASP,
-                           Representation="dict")
+                           Representation="dict", Configuration=Configuration)
 
 
-def steady_states_projected(Primes, Project, MaxOutput=1000, FnameASP=None):
+def steady_states_projected(Primes, Project, MaxOutput=1000, FnameASP=None, Configuration=None):
     """
     Returns a list of projected steady states using the Potassco_ ASP solver :ref:`[Gebser2011]<Gebser2011>`.
 
@@ -252,6 +377,7 @@ def steady_states_projected(Primes, Project, MaxOutput=1000, FnameASP=None):
         * *Project*: list of names
         * *MaxOutput* (int): maximal number of trap spaces to return
         * *FnameASP*: file name or *None*
+        * *Configuration* (str): clasp configuration preset, for example *"trendy"*, *"jumpy"* or *"crafty"*, or *None*
 
     **returns**:
         * *Activities* (list): projected steady states
@@ -268,10 +394,10 @@ def steady_states_projected(Primes, Project, MaxOutput=1000, FnameASP=None):
     assert (set(Project).issubset(set(Primes.keys())))
     
     return potassco_handle(Primes, Type="all", Bounds=("n", "n"), Project=Project, MaxOutput=MaxOutput,
-                           FnameASP=FnameASP, Representation="dict")
+                           FnameASP=FnameASP, Representation="dict", Configuration=Configuration)
 
 
-def primes2asp(Primes, FnameASP, Bounds, Project, Type):
+def primes2asp(Primes, FnameASP, Bounds, Project, Type, Heuristic=False, Minify=False):
     """
     Saves Primes as an *asp* file in the Potassco_ format intended for computing minimal and maximal trap spaces.
     The homepage of the Potassco_ solving collection is http://potassco.sourceforge.net.
@@ -293,15 +419,23 @@ def primes2asp(Primes, FnameASP, Bounds, Project, Type):
     For example for computing circuits or percolated trap spaces.
     Recognized values are 'circuits' and 'percolated', everything else will be ignored.
 
+    *Heuristic* adds "#heuristic" directives that guide clasp's domain heuristic towards the "in_set" atoms
+    of minimal or maximal trap spaces if *Type* is 'min' or 'max' and there is no projection.
+    The directive requires gringo 5 or clingo, gringo 4.4.0 rejects it.
+
+    *Minify* omits the header, all comments and blank lines, which reduces the text that is piped to the grounder.
+
     **arguments**:
        * *Primes*: prime implicants
        * *FnameASP*: name of *ASP* file or None
        * *Bounds* (tuple): cardinality constraint for the number of fixed variables
        * *Project* (list): names to project to or *None* for no projection
        * *Type* (str): one of 'max', 'min', 'all', 'percolated', 'circuits' or *None*
+       * *Heuristic* (bool): whether to add domain heuristic directives for 'min' and 'max'
+       * *Minify* (bool): whether to omit comments and blank lines
 
     **returns**:
-       * *FileASP* (str): file as string if not *FnameASP is None* and *None* otherwise
+       * *FileASP* (str): the *asp* file as string, the file *FnameASP* is only written if it is not *None*
 
     **example**::
 
@@ -311,103 +445,161 @@ def primes2asp(Primes, FnameASP, Bounds, Project, Type):
     """
 
     assert Type in [None, "max", "min", "all", "percolated", "circuits"]
-    assert FnameASP is None or type(FnameASP) == str
-    assert Bounds is None or type(Bounds) == tuple
-    assert Project is None or type(Project) == list
+    assert FnameASP is None or isinstance(FnameASP, str)
+    assert Bounds is None or isinstance(Bounds, tuple)
+    assert Project is None or isinstance(Project, list)
     
     if Project:
         Project = [x for x in Project if x in Primes]
     
-    lines = ['%% created on %s using PyBoolNet' % datetime.date.today().strftime('%d. %b. %Y'),
-             '% PyBoolNet is available at https://github.com/hklarner/PyBoolNet',
-             '',
-             '% encoding of prime implicants as hyper-arcs that consist of a unique "target" and (possibly) several "sources".',
-             '% "target" and "source" are triplets that consist of a variable name, an activity and a unique arc-identifier. ',
-             '']
+    asp_text = _asp_program(_primes_fingerprint(Primes), Bounds, Project, Type, Heuristic, Minify)
     
-    ID = 0
-    for name in sorted(Primes.keys()):
-        for value in [0, 1]:
-            for p in Primes[name][value]:
-                ID += 1
-                hyper = ['target("%s",%i,a%i).' % (name, value, ID)]
-                for n2, v2 in p.items():
-                    hyper.append('source("%s",%i,a%i).' % (n2, v2, ID))
-                lines += [' '.join(hyper)]
-    
-    lines += ['']
-    lines += [
-        '% generator: "in_set(ID)" specifies which arcs are chosen for a trap set (ID is unique for target(_,_,_)).',
-        '{in_set(ID) : target(V,S,ID)}.',
-        '',
-        '% consistency constraint',
-        ':- in_set(ID1), in_set(ID2), target(V,1,ID1), target(V,0,ID2).',
-        '',
-        '% stability constraint',
-        ':- in_set(ID1), source(V,S,ID1), not in_set(ID2) : target(V,S,ID2).',
-        '']
+    if FnameASP is not None:
+        with open(FnameASP, 'w') as f:
+            f.write(asp_text)
+        
+        print('created %s' % FnameASP)
+    
+    return asp_text
+
+
+def _asp_program(Fingerprint, Bounds, Project, Type, Heuristic, Minify):
+    """
+    Returns the *asp* file of :ref:`primes2asp` for the prime implicants given by *Fingerprint*.
+    The hyperarcs are shared between calls, only the constraints that depend on the remaining arguments are rebuilt.
+    """
+    
+    block = _strip_comments if Minify else str
+    
+    out = [] if Minify else ['%% created on %s using PyBoolNet' % datetime.date.today().strftime('%d. %b. %Y'), _ASP_HEADER]
+    
+    hyperarcs = _primes_hyperarcs(Fingerprint)
+    if hyperarcs:
+        out.append(hyperarcs)
+    
+    out.append(block(_ASP_TRAP_SET_RULES))
     
     if Type in ['percolated', 'circuits']:
-        lines += [
-            '% percolation constraint.',
-            '% ensure that if all sources of a prime are hit then it must belong to the solution.',
-            'in_set(ID) :- target(V,S,ID), hit(V1,S1) : source(V1,S1,ID).']
+        out.append(block(_ASP_PERCOLATION_RULES))
     else:
-        lines += [
-            '% bijection constraint (between asp solutions and trap spaces)',
-            '% to avoid the repetition of equivalent solutions we add all prime implicants',
-            '% that agree with the current solution.',
-            'in_set(ID) :- target(V,S,ID), hit(V,S), hit(V1,S1) : source(V1,S1,ID).']
+        out.append(block(_ASP_BIJECTION_RULES))
     
     if Type == 'circuits':
-        lines += ['',
-                  '% circuits constraint, distinguishes between circuit nodes and percolated nodes',
-                  'upstream(V1,V2) :- in_set(ID), target(V1,S1,ID), source(V2,S2,ID).',
-                  'upstream(V1,V2) :- upstream(V1,V3), upstream(V3,V2).',
-                  'percolated(V1) :- hit(V1,S), not upstream(V1,V1).']
+        out.append(block(_ASP_CIRCUITS_RULES))
     
-    lines += ['',
-              '% "hit" captures the stable variables and their activities.',
-              'hit(V,S) :- in_set(ID), target(V,S,ID).']
+    out.append(block(_ASP_HIT_RULES))
     
     if Bounds:
-        lines += ['',
-                  '%% cardinality constraint (enforced by "Bounds=%s")' % repr(Bounds), ]
+        if not Minify:
+            out.append('')
+            out.append('%% cardinality constraint (enforced by "Bounds=%s")' % repr(Bounds))
         if Bounds[0] > 0:
-            lines += [':- {hit(V,S)} %i.' % (Bounds[0] - 1)]
-        lines += [':- %i {hit(V,S)}.' % (Bounds[1] + 1)]
+            out.append(':- {hit(V,S)} %i.' % (Bounds[0] - 1))
+        out.append(':- %i {hit(V,S)}.' % (Bounds[1] + 1))
+    
+    if Heuristic and Type in _ASP_HEURISTICS and not Project:
+        out.append(block(_ASP_HEURISTICS[Type]))
     
     if Project:
-        lines += ['', '%% show projection (enforced by "Project=%s").' % (repr(sorted(Project)))]
-        lines += ['#show.']
-        lines += ['#show hit("{n}",S) : hit("{n}",S).'.format(n=name) for name in Project]
+        if not Minify:
+            out.append('')
+            out.append('%% show projection (enforced by "Project=%s").' % (repr(sorted(Project))))
+        out.append('#show.')
+        out.extend(f'#show hit("{name}",S) : hit("{name}",S).' for name in Project)
     
     elif Type == 'circuits':
-        lines += ['',
-                  '% show fixed nodes and distinguish between circuits and percolated',
-                  '#show percolated/1.',
-                  '#show hit/2.']
+        out.append(block(_ASP_SHOW_CIRCUITS))
     
     else:
-        lines += ['',
-                  '% show fixed nodes',
-                  '#show hit/2.']
+        out.append(block(_ASP_SHOW_HITS))
+    
+    return '\n'.join(out)
+
+
+@functools.lru_cache(maxsize=None)
+def _strip_comments(Text):
+    """
+    Returns *Text* without comments and blank lines.
+    """
     
-    if FnameASP is None:
-        return '\n'.join(lines)
+    return '\n'.join(x for x in Text.splitlines() if x and not x.startswith('%'))
+
+
+def _primes_fingerprint(Primes):
+    """
+    Returns a hashable representation of *Primes* that preserves the order of names, prime implicants and literals.
+    """
     
-    with open(FnameASP, 'w') as f:
-        f.write('\n'.join(lines))
+    return tuple((name, tuple(tuple(p.items()) for p in Primes[name][0]), tuple(tuple(p.items()) for p in Primes[name][1]))
+                 for name in _sorted_names(tuple(Primes)))
 
-    print('created %s' % FnameASP)
 
+@functools.lru_cache(maxsize=8)
+def _sorted_names(Names):
+    """
+    Returns *Names* in sorted order.
+    Cached because the names of the prime implicants rarely change between calls, a changed set of names is a new key.
+    """
+    
+    return tuple(sorted(Names))
 
-def potassco_handle(Primes, Type, Bounds, Project, MaxOutput, FnameASP, Representation):
+
+@functools.lru_cache(maxsize=8)
+def _prime_index(Fingerprint):
     """
-    Returns a list of trap spaces using the Potassco_ ASP solver :ref:`[Gebser2011]<Gebser2011>`.
+    Returns the index of :ref:`build_prime_index` for the prime implicants given by *Fingerprint*.
+    It is cached so that repeated queries for different states of the same prime implicants do not scan every prime.
     """
     
-    DEBUG = 0
+    primes = {name: [[dict(p) for p in primes0], [dict(p) for p in primes1]] for name, primes0, primes1 in Fingerprint}
+    
+    return PyBoolNet.PrimeImplicants.build_prime_index(primes)
+
+
+@functools.lru_cache(maxsize=32)
+def _primes_hyperarcs(Fingerprint):
+    """
+    Returns the hyperarcs of the prime implicant graph in the Potassco_ format, one hyperarc per line.
+    The result depends only on the prime implicants and is therefore cached across calls to :ref:`primes2asp`.
+    """
+    
+    out = []
+    
+    ID = 0
+    for name, *primes in Fingerprint:
+        for value in [0, 1]:
+            for p in primes[value]:
+                ID += 1
+                out.append(f'target("{name}",{value},a{ID}).' + ''.join(f' source("{n2}",{v2},a{ID}).' for n2, v2 in p))
+    
+    return '\n'.join(out)
+
+
+def potassco_handle(Primes, Type, Bounds, Project, MaxOutput, FnameASP, Representation, Threads=None, Configuration=None,
+                    State=None):
+    """
+    Returns a list of trap spaces using the Potassco_ ASP solver :ref:`[Gebser2011]<Gebser2011>`.
+
+    If the clingo module is installed, queries of *Type* "min" or "max" are solved in-process.
+    They are handed over to the binaries once the answers show more than *CLINGO_API_MAX_SYMBOLS* symbols,
+    because reading the symbols from the clingo module is slower than parsing the textual output of clasp.
+    The other types are solved by the binaries unless they are not installed.
+
+    *Threads* is the number of threads used by clasp in its parallel mode or *None* for a single thread.
+    Note that the parallel mode only pays off for hard instances, for small problems the overhead of
+    the additional threads usually dominates the solving time.
+
+    *Configuration* is the name of a clasp configuration preset, for example *"trendy"*, *"jumpy"* or *"crafty"*,
+    or *None* for clasp's default, see ``clasp --help=3``.
+
+    *State* restricts the prime implicants to those that are active in *State* or is *None* for no restriction.
+    If the clingo module is installed, *Type* is "min" or "max" and *State* is a complete state of *Primes*,
+    the restriction is modelled by external atoms of a grounded program that is cached for the given prime implicants,
+    so that repeated queries for different states are not grounded again.
+    
+    The steady states of networks with at most *STEADY_STATES_BITWISE_MAX* variables are computed without the solver
+    by evaluating the prime implicants on all states at once, unless *FnameASP* or *Configuration* are given.
+    """
     
     assert Type in ["max", "min", "all", "percolated", "circuits"]
     assert Representation in ["str", "dict"]
@@ -415,7 +607,8 @@ def potassco_handle(Primes, Type, Bounds, Project, MaxOutput, FnameASP, Represen
     if Bounds:
         Bounds = tuple([len(Primes) if x == "n" else x for x in Bounds])
 
-    params_clasp = ["--project"]
+    # the encoding has one answer set per trap space, projective enumeration is only needed for "#show" projections
+    params_clasp = ["--project"] if Project else []
     
     if Type == "max":
         params_clasp += ["--enum-mode=domRec", "--heuristic=Domain", "--dom-mod=5,16"]
@@ -423,115 +616,377 @@ def potassco_handle(Primes, Type, Bounds, Project, MaxOutput, FnameASP, Represen
     elif Type == "min":
         params_clasp += ["--enum-mode=domRec", "--heuristic=Domain", "--dom-mod=3,16"]
     
-    aspfile = primes2asp(Primes, FnameASP, Bounds, Project, Type)
+    if Threads:
+        params_clasp += ["--parallel-mode=%i,split" % Threads]
+    
+    if Configuration:
+        params_clasp += ["--configuration=%s" % Configuration]
+    
+    # every variable must be assigned, the externals of a cached control keep the values of the previous query
+    if (State is not None and FnameASP is None and clingo is not None and Type in ["min", "max"] and not Project
+            and set(State) == set(Primes) and set(State.values()) <= {0, 1}):
+        state_control = _state_control(_primes_fingerprint(Primes), Type, Bounds, MaxOutput, tuple(params_clasp))
+        result = _solve_with_state_control(state_control, State, Type, MaxOutput)
+    
+    elif (Type == "all" and Bounds == (len(Primes), len(Primes)) and not Project and State is None and FnameASP is None
+          and not Configuration and len(Primes) <= STEADY_STATES_BITWISE_MAX):
+        result = _steady_states_bitwise(Primes, MaxOutput)
+    
+    else:
+        active_primes = Primes
+        if State is not None:
+            index = _prime_index(_primes_fingerprint(Primes))
+            active_primes = PyBoolNet.PrimeImplicants.active_primes(Primes, State, Index=index)
+        
+        result = None
+        
+        # all, percolated and circuits usually have many answers, which are read faster from the output of the binaries
+        if FnameASP is None and clingo is not None and (Type in ["min", "max"] or not HAS_POTASSCO_BINARIES):
+            aspfile = primes2asp(active_primes, None, Bounds, Project, Type, Heuristic=True, Minify=True)
+            max_symbols = CLINGO_API_MAX_SYMBOLS if HAS_POTASSCO_BINARIES else None
+            result = _solve_with_clingo_api(aspfile, Type, MaxOutput, params_clasp, max_symbols)
+        
+        if result is None:
+            # the "#heuristic" directive is only understood by clingo, not by gringo 4.4.0
+            heuristic = FnameASP is None and CMD_CLINGO is not None
+            aspfile = primes2asp(active_primes, FnameASP, Bounds, Project, Type, Heuristic=heuristic, Minify=FnameASP is None)
+            result = _solve_with_potassco_binaries(aspfile, Type, MaxOutput, FnameASP, params_clasp)
+    
+    if len(result) == MaxOutput:
+        print("There are possibly more than %i trap spaces." % MaxOutput)
+        print("Increase MaxOutput to find out.")
+    
+    if Representation == "str":
+        subspace2str = PyBoolNet.StateTransitionGraphs.subspace2str
+        
+        if Type == "circuits":
+            result = [(subspace2str(Primes, x), subspace2str(Primes, y)) for x, y in result]
+        else:
+            result = [subspace2str(Primes, x) for x in result]
+    
+    return result
+
+
+def _steady_states_bitwise(Primes, MaxOutput):
+    """
+    Returns at most *MaxOutput* steady states of *Primes* by evaluating the prime implicants on all states at once.
+    A set of states is encoded by the bits of an integer, the state *x* is the bit at position
+    *sum(x[name] * 2**i)* where *i* is the index of *name* in the sorted names.
+    The integers have *2**len(Primes)* bits, so this is only feasible for small networks.
+    """
+    
+    names = sorted(Primes)
+    size = 2 ** len(names)
+    full = (1 << size) - 1
+    
+    # the states in which a variable is active
+    active = {}
+    for i, name in enumerate(names):
+        states = ((1 << 2 ** i) - 1) << 2 ** i
+        length = 2 ** (i + 1)
+        while length < size:
+            states |= states << length
+            length *= 2
+        active[name] = states
+    
+    # the states in which the activity of every variable agrees with its update function
+    steady = full
+    for name in names:
+        func = 0
+        for prime in Primes[name][1]:
+            states = full
+            for x, v in prime.items():
+                states &= active[x] if v else full ^ active[x]
+            func |= states
+        
+        steady &= full ^ func ^ active[name]
+        if not steady:
+            break
+    
+    result = []
+    while steady and len(result) < MaxOutput:
+        lowest = steady & -steady
+        x = lowest.bit_length() - 1
+        result.append({name: (x >> i) & 1 for i, name in enumerate(names)})
+        steady ^= lowest
+    
+    return result
+
+
+def _solve_with_clingo_api(AspFile, Type, MaxOutput, ParamsClasp, MaxSymbols=None):
+    """
+    Grounds and solves *AspFile* in-process using the clingo Python module.
+    Returns *None* if the answers show more than *MaxSymbols* symbols, see *_solve_clingo_control*.
+    """
+    
+    messages = []
+    
+    try:
+        # collect infos and warnings like the stderr of the binaries, they are only printed if clingo fails
+        ctl = clingo.Control(["--models=%i" % MaxOutput] + ParamsClasp, logger=lambda code, message: messages.append(message))
+        ctl.add("base", [], AspFile)
+        ctl.ground([("base", [])])
+        
+        return _solve_clingo_control(ctl, Type, MaxOutput, MaxSymbols)
+    
+    except RuntimeError as Ex:
+        _print_clingo_failure(AspFile, messages, Ex)
+        raise Ex
+
+
+def _print_clingo_failure(AspFile, Messages, Ex):
+    """
+    Prints *AspFile* and the infos and warnings *Messages* that clingo logged before it failed with *Ex*.
+    """
+    
+    print(AspFile)
+    print(Ex)
+    print("".join(Messages))
+    print("\nCall to clingo failed.")
+
+
+@functools.lru_cache(maxsize=8)
+def _state_control(Fingerprint, Type, Bounds, MaxOutput, ParamsClasp):
+    """
+    Returns a grounded clingo control for the trap spaces of the prime implicants given by *Fingerprint*
+    that consist of prime implicants that are active in a state.
+    The state is modelled by the external atoms "state(V,S)", see *_solve_with_state_control*.
+    The control is cached so that queries for different states only solve but do not ground again.
+    It is returned together with its program, the list of messages logged by clingo and a lock,
+    because the cached control is shared by all threads.
+    """
+    
+    aspfile = _asp_program(Fingerprint, Bounds, None, Type, True, True) + '\n' + _strip_comments(_ASP_STATE_RULES)
+    messages = []
     
     try:
-        # pipe ASP file
-        if FnameASP is None:
-            cmd_gringo = [CMD_GRINGO]
-            proc_gringo = subprocess.Popen(cmd_gringo, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        ctl = clingo.Control(["--models=%i" % MaxOutput] + list(ParamsClasp), logger=lambda code, message: messages.append(message))
+        ctl.add("base", [], aspfile)
+        ctl.ground([("base", [])])
+    
+    except RuntimeError as Ex:
+        _print_clingo_failure(aspfile, messages, Ex)
+        raise Ex
+    
+    return ctl, aspfile, messages, threading.Lock()
+
+
+def _solve_with_state_control(StateControl, State, Type, MaxOutput):
+    """
+    Assigns the external atoms "state(V,S)" of a control returned by *_state_control* to *State* and solves it.
+    The lock of the control is held until the solving is finished.
+    """
+    
+    ctl, aspfile, messages, lock = StateControl
+    
+    with lock:
+        # only keep the messages of this query
+        del messages[:]
+        
+        try:
+            for name, value in State.items():
+                ctl.assign_external(clingo.Function("state", [clingo.String(name), clingo.Number(value)]), True)
+                ctl.assign_external(clingo.Function("state", [clingo.String(name), clingo.Number(1 - value)]), False)
+            
+            return _solve_clingo_control(ctl, Type, MaxOutput)
+        
+        except RuntimeError as Ex:
+            _print_clingo_failure(aspfile, messages, Ex)
+            raise Ex
+
+
+def _solve_clingo_control(Control, Type, MaxOutput, MaxSymbols=None):
+    """
+    Solves a grounded clingo control and returns at most *MaxOutput* trap spaces, or circuits if *Type* is "circuits".
+    The solving is cancelled and *None* is returned once the answers show more than *MaxSymbols* symbols,
+    or never if *MaxSymbols* is *None*.
+    """
+    
+    # every symbol of a model is a call into the clingo library, the answers are converted to text once
+    # and parsed like the output of clasp
+    answers = []
+    size = 0
+    with Control.solve(yield_=True) as handle:
+        for model in handle:
+            answers.append(str(model))
+            size += answers[-1].count(" ") + 1
+            
+            if MaxSymbols is not None and size > MaxSymbols:
+                handle.cancel()
+                return None
+    
+    return [_parse_answer(x, Type) for x in answers[:MaxOutput]]
+
+
+def _solve_with_potassco_binaries(AspFile, Type, MaxOutput, FnameASP, ParamsClasp):
+    """
+    Grounds and solves *AspFile* with the Potassco_ binaries and parses the textual output of the solver.
+    A piped *AspFile* is grounded and solved by a single clingo process if clingo is installed,
+    otherwise gringo is piped into clasp.
+    The output of the solver is parsed while it is streamed, the error streams of the processes are drained at the same time.
+    """
+    
+    DEBUG = 0
+    
+    error = bytearray()
+    
+    try:
+        # pipe ASP file into clingo
+        if FnameASP is None and CMD_CLINGO is not None:
+            cmds = [[CMD_CLINGO, '--models=%i' % MaxOutput] + ParamsClasp]
+            proc_solver = subprocess.Popen(cmds[0], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
                                            stderr=subprocess.PIPE)
-            cmd_clasp = [CMD_CLASP, '--models=%i' % MaxOutput] + params_clasp
-            proc_clasp = subprocess.Popen(cmd_clasp, stdin=proc_gringo.stdout, stdout=subprocess.PIPE,
-                                          stderr=subprocess.PIPE)
             
-            proc_gringo.stdin.write(aspfile.encode())
-            proc_gringo.stdin.close()
+            proc_solver.stdin.write(AspFile.encode())
+            proc_solver.stdin.close()
+            stderrs = [proc_solver.stderr]
+        
+        # pipe ASP file into gringo
+        elif FnameASP is None:
+            cmds = [[CMD_GRINGO], [CMD_CLASP, '--models=%i' % MaxOutput] + ParamsClasp]
+            proc_gringo = subprocess.Popen(cmds[0], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                           stderr=subprocess.PIPE)
+            proc_solver = subprocess.Popen(cmds[1], stdin=proc_gringo.stdout, stdout=subprocess.PIPE,
+                                           stderr=subprocess.PIPE)
             
-            output, error = proc_clasp.communicate()
-            error = error.decode()
-            output = output.decode()
+            proc_gringo.stdin.write(AspFile.encode())
+            proc_gringo.stdin.close()
+            stderrs = [proc_gringo.stderr, proc_solver.stderr]
         
         # read ASP file
         else:
-            cmd_gringo = [CMD_GRINGO, FnameASP]
-            proc_gringo = subprocess.Popen(cmd_gringo, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            cmds = [[CMD_GRINGO, FnameASP], [CMD_CLASP, '--models=%i' % MaxOutput] + ParamsClasp]
+            proc_gringo = subprocess.Popen(cmds[0], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
                                            stderr=subprocess.PIPE)
-            cmd_clasp = [CMD_CLASP, '--models=%i' % MaxOutput] + params_clasp
-            proc_clasp = subprocess.Popen(cmd_clasp, stdin=proc_gringo.stdout, stdout=subprocess.PIPE,
-                                          stderr=subprocess.PIPE)
-            
-            output, error = proc_clasp.communicate()
-            error = error.decode()
-            output = output.decode()
+            proc_solver = subprocess.Popen(cmds[1], stdin=proc_gringo.stdout, stdout=subprocess.PIPE,
+                                           stderr=subprocess.PIPE)
+            stderrs = [proc_gringo.stderr, proc_solver.stderr]
+        
+        lines = _drain_pipes(proc_solver.stdout, stderrs, error)
+        result = _parse_clasp_output(lines, Type, MaxOutput)
+        
+        # the solver stops after *MaxOutput* answers, read the pipes until they are closed
+        for _ in lines:
+            pass
+        
+        proc_solver.wait()
     
     except Exception as Ex:
-        print(aspfile)
+        print(AspFile)
         print(Ex)
         print("\nCall to gringo and / or clasp failed.")
         
         if FnameASP is not None:
-            print('\ncommand: "%s"' % " ".join(cmd_gringo + ["|"] + cmd_clasp))
+            print('\ncommand: "%s"' % " | ".join(" ".join(x) for x in cmds))
         
         raise Ex
     
-    if "ERROR" in error:
+    if b"ERROR" in error:
         print("\nCall to gringo and / or clasp failed.")
         if FnameASP is not None:
-            print('\nasp file: "%s"' % aspfile)
-        print('\ncommand: "%s"' % " ".join(cmd_gringo + ["|"] + cmd_clasp))
-        print('\nerror: "%s"' % error)
+            print('\nasp file: "%s"' % FnameASP)
+        print('\ncommand: "%s"' % " | ".join(" ".join(x) for x in cmds))
+        print('\nerror: "%s"' % error.decode())
         raise Exception
     
     if DEBUG:
-        print(aspfile)
-        print("cmd_gringo: %s" % " ".join(cmd_gringo))
-        print("cmd_clasp:  %s" % " ".join(cmd_clasp))
+        print(AspFile)
+        print("cmds: %s" % " | ".join(" ".join(x) for x in cmds))
         print("error:")
-        print(error)
-        print("output:")
-        print(output)
+        print(error.decode())
+        print("result:")
+        print(result)
+    
+    return result
+
+
+def _drain_pipes(Stdout, Stderrs, Error):
+    """
+    Yields the decoded lines of the pipe *Stdout* and appends the bytes read from the pipes *Stderrs* to *Error*.
+    The pipes are read concurrently in the calling thread until they are closed,
+    so a process that writes a lot to one of its error streams can not block the others.
+    """
     
-    lines = output.split("\n")
+    # select does not support pipes on Windows, the error streams are read by threads instead
+    if PyBoolNet.Utility.Misc.os_is_windows():
+        errors = [[] for _ in Stderrs]
+        threads = [threading.Thread(target=lambda p, e: e.append(p.read()), args=(pipe, err), daemon=True)
+                   for pipe, err in zip(Stderrs, errors)]
+        for thread in threads:
+            thread.start()
+        
+        for line in Stdout:
+            yield line.decode()
+        
+        for thread, err in zip(threads, errors):
+            thread.join()
+            Error += b"".join(err)
+        return
+    
+    with selectors.DefaultSelector() as selector:
+        for pipe in [Stdout] + Stderrs:
+            selector.register(pipe, selectors.EVENT_READ)
+        
+        rest = b""
+        while selector.get_map():
+            for key, _ in selector.select():
+                data = os.read(key.fd, 65536)
+                
+                if not data:
+                    selector.unregister(key.fileobj)
+                    key.fileobj.close()
+                
+                elif key.fileobj is Stdout:
+                    *complete, rest = (rest + data).split(b"\n")
+                    for line in complete:
+                        yield line.decode()
+                
+                else:
+                    Error += data
+        
+        if rest:
+            yield rest.decode()
+
+
+def _parse_clasp_output(Lines, Type, MaxOutput):
+    """
+    Parses at most *MaxOutput* answers from the lines of the textual output of clasp.
+    """
+    
+    lines = iter(Lines)
     result = []
     
     # parser
     # answers are assumed to be single lines after a line that
     # begins with 'Answer'
     
-    if Type == "circuits":
-        while lines and len(result) < MaxOutput:
-            line = lines.pop(0)
+    for line in lines:
+        if line.startswith("Answer"):
+            result.append(_parse_answer(next(lines, ""), Type))
             
-            if line[:6] == "Answer":
-                line = lines.pop(0)
-                
-                tspace = [x for x in line.split() if "hit" in x]
-                tspace = [x[4:-1].split(",") for x in tspace]
-                tspace = [(x[0][1:-1], int(x[1])) for x in tspace]
-                
-                perc = [x[12:-2] for x in line.split() if "perc" in x]
-                perc = [x for x in tspace if x[0] in perc]
-                perc = dict(perc)
-                
-                circ = [x for x in tspace if x[0] not in perc]
-                circ = dict(circ)
-                
-                result.append((circ, perc))
+            if len(result) >= MaxOutput:
+                break
+    
+    return result
 
-    else:
-        while lines and len(result) < MaxOutput:
-            line = lines.pop(0)
-            
-            if line[:6] == "Answer":
-                line = lines.pop(0)
-                d = [x[4:-1].split(",") for x in line.split()]
-                d = [(x[0][1:-1], int(x[1])) for x in d]
-                result.append(dict(d))
+
+def _parse_answer(Line, Type):
+    """
+    Parses a single answer of clasp, or a model of the clingo module converted to a string.
+    Returns a trap space, or the tuple *(circuits, percolated)* if *Type* is "circuits".
+    """
     
-    if len(result) == MaxOutput:
-        print("There are possibly more than %i trap spaces." % MaxOutput)
-        print("Increase MaxOutput to find out.")
+    tspace = {m.group(1): int(m.group(2)) for m in _HIT_RE.finditer(Line)}
     
-    if Representation == "str":
-        subspace2str = PyBoolNet.StateTransitionGraphs.subspace2str
+    if Type == "circuits":
+        perc_names = set(_PERC_RE.findall(Line))
         
-        if Type == "circuits":
-            result = [(subspace2str(Primes, x), subspace2str(Primes, y)) for x, y in result]
-        else:
-            result = [subspace2str(Primes, x) for x in result]
+        perc = {x: v for x, v in tspace.items() if x in perc_names}
+        circ = {x: v for x, v in tspace.items() if x not in perc_names}
+        
+        return circ, perc
     
-    return result
+    return tspace
 
 
 def Count(Spaces):
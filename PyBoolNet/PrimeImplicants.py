@@ -680,13 +680,43 @@ def input_combinations(Primes, Format="dict"):
 
 
 
-def active_primes(Primes, State):
+def build_prime_index(Primes):
+    """
+    returns for every literal *(name, value)* the primes that contain it.
+    a prime is identified by the triplet *(target name, target value, position in Primes[name][value])*.
+    build the index once and pass it to :ref:`active_primes` when querying many states of the same *Primes*.
+    """
+
+    index = {}
+
+    for name in Primes:
+        for v in [0,1]:
+            for i, p in enumerate(Primes[name][v]):
+                for literal in p.items():
+                    index.setdefault(literal, []).append((name, v, i))
+
+    return index
+
+
+def active_primes(Primes, State, Index=None):
     """
     returns all primes that are active in, i.e., consistent with *State*.
+    if *Index* is given, see :ref:`build_prime_index`, the inconsistent primes are looked up instead of checking every prime.
     """
 
     active_primes = dict((name,[[],[]]) for name in Primes)
 
+    if Index is not None:
+        inconsistent = set()
+        for name, value in State.items():
+            inconsistent.update(Index.get((name, 1-value), []))
+
+        for name in Primes:
+            v = State[name]
+            active_primes[name][v] = [dict(p) for i, p in enumerate(Primes[name][v]) if (name, v, i) not in inconsistent]
+
+        return active_primes
+
     for name in Primes:
         for v in [0,1]:
             for p in Primes[name][v]:
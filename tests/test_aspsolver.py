@@ -1,7 +1,11 @@
 
 
+import concurrent.futures
+import itertools
 import os
 
+import pytest
+
 import PyBoolNet
 
 FILES_IN = os.path.join(os.path.dirname(__file__), "files_input")
@@ -278,3 +282,113 @@ def test_encoding_bijection():
     result.sort(key=lambda x: tuple(sorted(x.items())))
 
     assert result == [{"v1": 0, "v2": 0}, {"v1": 1}]
+
+
+def _normalized(primes, Type, tspaces):
+    subspace2str = PyBoolNet.StateTransitionGraphs.subspace2str
+
+    if Type == "circuits":
+        return sorted(subspace2str(primes, x) + subspace2str(primes, y) for x, y in tspaces)
+
+    return sorted(subspace2str(primes, x) for x in tspaces)
+
+
+def test_solvers_agree(monkeypatch):
+    primes = PyBoolNet.Repository.get_primes("raf")
+
+    for Type in ["min", "max", "all", "percolated", "circuits"]:
+        aspfile = PyBoolNet.AspSolver.primes2asp(primes, None, None, None, Type)
+
+        with monkeypatch.context() as m:
+            m.setattr(PyBoolNet.AspSolver, "CMD_CLINGO", None)
+            expected = PyBoolNet.AspSolver._solve_with_potassco_binaries(aspfile, Type, 1000, None, ["--project"])
+
+        if PyBoolNet.AspSolver.CMD_CLINGO is not None:
+            answer = PyBoolNet.AspSolver._solve_with_potassco_binaries(aspfile, Type, 1000, None, ["--project"])
+            assert _normalized(primes, Type, answer) == _normalized(primes, Type, expected)
+
+        if PyBoolNet.AspSolver.clingo is not None:
+            answer = PyBoolNet.AspSolver._solve_with_clingo_api(aspfile, Type, 1000, ["--project"])
+            assert _normalized(primes, Type, answer) == _normalized(primes, Type, expected)
+
+
+def test_steady_states_bitwise(monkeypatch):
+    for name in ["raf", "n7s3", "xiao_wnt5a", "randomnet_n7k3", "multivalued"]:
+        primes = PyBoolNet.Repository.get_primes(name)
+
+        with monkeypatch.context() as m:
+            m.setattr(PyBoolNet.AspSolver, "STEADY_STATES_BITWISE_MAX", -1)
+            expected = PyBoolNet.AspSolver.steady_states(primes)
+
+        answer = PyBoolNet.AspSolver._steady_states_bitwise(primes, 1000)
+        assert _normalized(primes, "all", answer) == _normalized(primes, "all", expected)
+        assert _normalized(primes, "all", PyBoolNet.AspSolver.steady_states(primes)) == _normalized(primes, "all", expected)
+
+    primes = PyBoolNet.Repository.get_primes("randomnet_n7k3")
+    assert len(PyBoolNet.AspSolver._steady_states_bitwise(primes, 3)) == 3
+    assert PyBoolNet.AspSolver._steady_states_bitwise({}, 1000) == [{}]
+
+
+def test_clingo_api_hands_over_to_binaries(monkeypatch):
+    primes = PyBoolNet.Repository.get_primes("grieco_mapk")
+
+    for Type in ["min", "max"]:
+        expected = PyBoolNet.AspSolver.trap_spaces(primes, Type, Representation="str")
+
+        with monkeypatch.context() as m:
+            m.setattr(PyBoolNet.AspSolver, "CLINGO_API_MAX_SYMBOLS", 0)
+            m.setattr(PyBoolNet.AspSolver, "CMD_CLINGO", None)
+            answer = PyBoolNet.AspSolver.trap_spaces(primes, Type, Representation="str")
+
+        assert sorted(answer) == sorted(expected)
+
+
+def test_smallest_trapspaces_batch():
+    primes = PyBoolNet.Repository.get_primes("raf")
+    states = ["001", "110", {"Raf": 1, "Mek": 1, "Erk": 0}]
+
+    expected = [PyBoolNet.AspSolver.smallest_trapspace(primes, x) for x in states]
+
+    assert PyBoolNet.AspSolver.smallest_trapspaces_batch(primes, states, Workers=2) == expected
+
+
+def test_trap_spaces_configuration():
+    primes = PyBoolNet.Repository.get_primes("raf")
+
+    expected = PyBoolNet.AspSolver.trap_spaces(primes, "all", Representation="str")
+
+    for configuration in ["trendy", "jumpy", "crafty"]:
+        answer = PyBoolNet.AspSolver.trap_spaces(primes, "all", Representation="str", Configuration=configuration)
+        assert sorted(answer) == sorted(expected)
+
+
+def test_trap_spaces_that_contain_state_reuses_grounding():
+    primes = PyBoolNet.Repository.get_primes("tournier_apoptosis")
+    states = [PyBoolNet.StateTransitionGraphs.state2dict(primes, x) for x in ["010101010101", "111000111000", "000000000000", "111111111111"]]
+
+    for Type in ["min", "max", "all"]:
+        for state in states:
+            active_primes = PyBoolNet.PrimeImplicants.active_primes(primes, state)
+            expected = PyBoolNet.AspSolver.potassco_handle(active_primes, Type, (1, "n"), None, 1000, None, "str")
+            answer = PyBoolNet.AspSolver.potassco_handle(primes, Type, (1, "n"), None, 1000, None, "str", State=state)
+
+            assert sorted(answer) == sorted(expected)
+
+
+def test_trap_spaces_that_contain_state_threads():
+    primes = PyBoolNet.Repository.get_primes("tournier_apoptosis")
+    states = [dict(zip(sorted(primes), x)) for x in itertools.islice(itertools.product([0, 1], repeat=len(primes)), 0, 4096, 16)]
+    expected = [PyBoolNet.AspSolver.smallest_trapspace(primes, x) for x in states]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        answer = list(executor.map(PyBoolNet.AspSolver.smallest_trapspace, itertools.repeat(primes), states))
+
+    assert answer == expected
+
+
+def test_trap_spaces_that_contain_state_incomplete_state():
+    primes = PyBoolNet.Repository.get_primes("raf")
+    PyBoolNet.AspSolver.smallest_trapspace(primes, {"Raf": 0, "Mek": 1, "Erk": 1})
+
+    with pytest.raises(KeyError):
+        PyBoolNet.AspSolver.smallest_trapspace(primes, {"raf": 1, "Mek": 1, "Erk": 0})
@@ -244,3 +244,14 @@ def test_create_blinkers():
     assert PyBoolNet.PrimeImplicants.are_equal(expected, primes), str(primes)+" vs "+str(expected)
 
 
+
+
+def test_active_primes_with_index():
+    primes = PyBoolNet.Repository.get_primes("tournier_apoptosis")
+    index = PyBoolNet.PrimeImplicants.build_prime_index(primes)
+
+    for x in ["010101010101", "111000111000", "000000000000", "111111111111"]:
+        state = PyBoolNet.StateTransitionGraphs.state2dict(primes, x)
+        expected = PyBoolNet.PrimeImplicants.active_primes(primes, state)
+
+        assert PyBoolNet.PrimeImplicants.active_primes(primes, state, Index=index) == expected